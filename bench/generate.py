@@ -0,0 +1,124 @@
+#  Synthetic ZNC day logs for the benchmarks: python3 bench/generate.py <log directory> [--days N] [--size MB] [--seed N]
+#
+#  Lines are written the way ZNC's log module writes them, with the mix of a busy channel: mostly messages, some
+#  actions and notices, joins, parts and quits, the odd nick change, kick, topic and mode, control codes, URLs,
+#  non-ASCII text and a few lines from clients that don't send UTF-8.
+
+import os.path
+import random
+from datetime import date, timedelta
+
+WORDS = ('the', 'a', 'is', 'it', 'to', 'and', 'of', 'that', 'in', 'you', 'for', 'on', 'with', 'this', 'but', 'not',
+         'have', 'just', 'what', 'so', 'if', 'can', 'do', 'was', 'be', 'are', 'at', 'build', 'works', 'broken', 'patch',
+         'release', 'python', 'server', 'client', 'bouncer', 'history', 'message', 'channel', 'log', 'file', 'merge',
+         'branch', 'test', 'error', 'config', 'network', 'lol', 'thanks', 'yeah', 'ok', 'hmm', 'maybe', 'tomorrow')
+UNICODE_WORDS = ('café', 'naïve', 'über', 'señor', 'привет', 'こんにちは', '🙂', '👍', 'ß', 'Ω')
+LATIN1_WORDS = ('café'.encode('latin-1'), 'déjà'.encode('latin-1'), 'über'.encode('latin-1'))
+CONTROL_CODES = ('\x02', '\x1d', '\x1f', '\x0f', '\x0304', '\x0312,1', '\x03')
+REASONS = ('Ping timeout: 240 seconds', 'Quit: Leaving', 'Remote host closed the connection', 'Read error: Connection reset by peer')
+
+# Share of the lines of each kind, the rest being messages
+KINDS = (('action', 0.04), ('notice', 0.04), ('join', 0.06), ('part', 0.04), ('quit', 0.05),
+         ('nick', 0.02), ('kick', 0.005), ('topic', 0.005), ('mode', 0.02))
+# Share of the messages with control codes, a URL, non-ASCII UTF-8 words and bytes that aren't UTF-8
+CONTROL_SHARE = 0.05
+URL_SHARE = 0.03
+UNICODE_SHARE = 0.02
+LATIN1_SHARE = 0.002
+
+class Channel:
+    """The people in a channel, whose nicks, idents and hosts stay the same from line to line."""
+
+    def __init__(self, rng, people=150):
+        self.rng = rng
+        self.people = [self.person(i) for i in range(people)]
+
+    def person(self, i):
+        nick = '{}{}'.format(self.rng.choice(('alice', 'bob', 'carol', 'dave', 'eve', 'mallory', 'trent', 'peggy',
+                                              'victor', 'walter', '[x]', 'zed_', 'Guest')), i)
+        return [nick, '~' + nick.strip('[]_')[:9], '{}.example.net'.format(self.rng.randrange(1 << 24))]
+
+    # Message text of about the usual length of IRC messages, in bytes since some of it isn't UTF-8
+    def text(self):
+        rng = self.rng
+        words = [rng.choice(WORDS) for i in range(max(1, int(rng.lognormvariate(2.0, 0.7))))]
+        if rng.random() < UNICODE_SHARE:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(UNICODE_WORDS))
+        if rng.random() < URL_SHARE:
+            words.append('https://example.org/{}/{}'.format(rng.choice(WORDS), rng.randrange(100000)))
+        if rng.random() < CONTROL_SHARE:
+            i = rng.randrange(len(words))
+            words[i] = rng.choice(CONTROL_CODES) + words[i] + rng.choice(('\x0f', '\x02', ''))
+        text = ' '.join(words).encode()
+        if rng.random() < LATIN1_SHARE:
+            text += b' ' + rng.choice(LATIN1_WORDS)
+        return text
+
+    # Return a log line without its '[HH:MM:SS] ' timestamp
+    def line(self):
+        rng = self.rng
+        nick, ident, host = person = rng.choice(self.people)
+        kind = 'message'
+        roll = rng.random()
+        for name, share in KINDS:
+            if roll < share:
+                kind = name
+                break
+            roll -= share
+
+        if kind == 'message':
+            return '<{}> '.format(nick).encode() + self.text()
+        if kind == 'action':
+            return '* {} '.format(nick).encode() + self.text()
+        if kind == 'notice':
+            return '-{}- '.format(nick).encode() + self.text()
+        if kind == 'join':
+            return '*** Joins: {} ({}@{})'.format(nick, ident, host).encode()
+        if kind == 'part':
+            return '*** Parts: {} ({}@{}) ({})'.format(nick, ident, host, rng.choice(('', 'bye'))).encode()
+        if kind == 'quit':
+            return '*** Quits: {} ({}@{}) ({})'.format(nick, ident, host, rng.choice(REASONS)).encode()
+        if kind == 'nick':
+            person[0] = '{}_{}'.format(nick.split('_')[0], rng.randrange(100))
+            return '*** {} is now known as {}'.format(nick, person[0]).encode()
+        if kind == 'kick':
+            return '*** {} was kicked by {} ({})'.format(nick, rng.choice(self.people)[0], rng.choice(WORDS)).encode()
+        if kind == 'topic':
+            return "*** {} changes topic to '".format(nick).encode() + self.text() + b"'"
+        return '*** {} sets mode: +{} {}'.format(nick, rng.choice('ovb'), rng.choice(self.people)[0]).encode()
+
+# Write a day's log file of about size bytes, its lines spread over the whole day
+def generate_day(path, channel, size, average_line=70):
+    rng = channel.rng
+    gap = 86400 / (size / average_line)
+    second = 0.0
+    written = 0
+    with open(path, 'wb') as log:
+        while written < size:
+            second = min(second + rng.expovariate(1 / gap), 86399)
+            line = '[{:02d}:{:02d}:{:02d}] '.format(int(second) // 3600, int(second) // 60 % 60, int(second) % 60).encode() + channel.line() + b'\n'
+            log.write(line)
+            written += len(line)
+    return written
+
+# Write days of logs of size bytes each, ending with today's, into a window directory. Returns their dates.
+def generate_logs(directory, days=3, size=4 * 1024 * 1024, seed=1):
+    os.makedirs(directory, exist_ok=True)
+    channel = Channel(random.Random(seed))
+    dates = [(date.today() - timedelta(days=i)).isoformat() for i in reversed(range(days))]
+    for day in dates:
+        generate_day(os.path.join(directory, day + '.log'), channel, size)
+    return dates
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write synthetic ZNC day logs for the benchmarks.')
+    parser.add_argument('directory', help='Window directory to write YYYY-MM-DD.log files into')
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--size', type=float, default=4, help='Megabytes of each day')
+    parser.add_argument('--seed', type=int, default=1)
+    arguments = parser.parse_args()
+
+    for day in generate_logs(arguments.directory, arguments.days, int(arguments.size * 1024 * 1024), arguments.seed):
+        print(os.path.join(arguments.directory, day + '.log'))
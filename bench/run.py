@@ -0,0 +1,211 @@
+#  Benchmarks of chathistory read from the text logs: python3 bench/run.py [--save-baseline] [--threshold 0.25]
+#
+#  Loads the module with the znc stand-in next to this file, writes synthetic day logs and measures how fast whole
+#  days are parsed, how fast log lines are formatted, and the p50/p99 latency of forward, backward and max-size
+#  requests read the way a worker process reads them, batch generation included. The results are compared with
+#  baseline.json and written to bench_output.txt at the top of the repository. Exits with 1 if any result is slower
+#  than its baseline by more than the threshold.
+
+import json
+import os.path
+import random
+import sys
+import tempfile
+import types
+from collections import defaultdict
+from datetime import date, timedelta
+from time import perf_counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path[0:0] = [BENCH_DIR, ROOT_DIR]
+
+import znc
+import chathistory
+from generate import generate_logs
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+OUTPUT_FILE = os.path.join(ROOT_DIR, 'bench_output.txt')
+# Slowdown compared to the baseline that is reported as a regression
+THRESHOLD = 0.25
+USER = 'bench'
+NETWORK = 'net'
+WINDOW = '#bench'
+
+# Requests timed by the benchmark, by name: the CHATHISTORY parameters, {target}, {anchor} and {size} being filled in
+# for each request, and whether it goes through the window's hot tail
+REQUESTS = {
+    'after': ('AFTER {target} {anchor} 50', False),
+    'before': ('BEFORE {target} {anchor} 50', False),
+    'around': ('AROUND {target} {anchor} 50', False),
+    'latest max': ('LATEST {target} * {size}', False),
+    'between max': ('BETWEEN {target} {anchor} timestamp=9999-12-31T23:59:59.999Z {size}', False),
+    'latest hot tail': ('LATEST {target} * 50', True),
+}
+
+# Return the value below which the given fraction of the values fall
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+# Load the module as ZNC would, with a user whose logs are under znc_path
+def load_module(znc_path, size):
+    znc.CZNC.Get().path = znc_path
+    module = chathistory.chathistory(USER, NETWORK, os.path.join(znc_path, 'moddata', 'chathistory'))
+    os.makedirs(module.GetSavePath(), exist_ok=True)
+    module.config = defaultdict(dict, {USER: {'size': size, 'extras': True, 'pace': 0,
+                                              'path': znc_path + '/users/$USER/moddata/log/$NETWORK/$WINDOW/'}})
+    message = types.SimpleNamespace(s='')
+    if not module.OnLoad('', message):
+        raise RuntimeError('Could not load the module: ' + message.s)
+    return module
+
+# Read a request the way a worker process does and send its batch, returning the seconds it took and the lines sent
+def time_request(module, line, hot_tail):
+    client = module.GetClient()
+    started = perf_counter()
+    user_config = module.get_user_config()
+    command = module.parse_command(client, user_config, line.split()[1:], line)
+    lines = module.read_history(user_config, USER, NETWORK, *command, live_events=0 if hot_tail else None)
+    module.generate_batch(client, USER, user_config, lines, 'chathistory ' + WINDOW)
+    seconds = perf_counter() - started
+    client.lines.clear()
+    return seconds, len(lines)
+
+# Return (latencies, lines sent) of the requests of each kind, at the same random anchors for every run with the same seed.
+# Each request is timed repeats times, keeping the fastest, so the percentiles are those of the requests and not of
+# whatever else the machine was doing.
+def bench_requests(module, dates, size, iterations, repeats, seed):
+    results = {}
+    for name, (params, hot_tail) in REQUESTS.items():
+        rng = random.Random(seed)
+        lines = []
+        for i in range(iterations):
+            anchor = 'timestamp={}T{:02d}:{:02d}:{:02d}.000Z'.format(rng.choice(dates), rng.randrange(24), rng.randrange(60), rng.randrange(60))
+            lines.append('CHATHISTORY ' + params.format(target=WINDOW, anchor=anchor, size=size))
+        # The first request warms the caches
+        time_request(module, lines[0], hot_tail)
+        latencies = [float('inf')] * iterations
+        sent = 0
+        for repeat in range(repeats):
+            for i, line in enumerate(lines):
+                seconds, count = time_request(module, line, hot_tail)
+                latencies[i] = min(latencies[i], seconds)
+                sent += count
+        results[name] = (latencies, sent / repeats)
+    return results
+
+# Return the megabytes and lines per second parse_logs reads a whole day at, from the file itself for the newest day,
+# and parsing it again into a fresh ParsedLog for a past day
+def bench_scan(module, directory, day, repeats):
+    user_config = module.get_user_config()
+    size = os.path.getsize(os.path.join(directory, day + '.log'))
+    low = (day + ' 00:00:00.000', -1)
+    high = ((date.fromisoformat(day) + timedelta(days=1)).isoformat() + ' 00:00:00.000', -1)
+    timings = []
+    for i in range(repeats):
+        module.parsed_logs.clear()
+        module.parsed_logs_memory = 0
+        module.log_indexes.clear()
+        started = perf_counter()
+        lines = module.parse_logs(user_config, directory, WINDOW, low, high, sys.maxsize, True)
+        timings.append(perf_counter() - started)
+    seconds = percentile(timings, 0.5)
+    return size / 1024 / 1024 / seconds, len(lines) / seconds
+
+# Return the lines per second format_line formats the lines of a day at
+def bench_format(module, directory, day, repeats):
+    with open(os.path.join(directory, day + '.log'), 'rb') as log:
+        lines = [chathistory.decode_line(line) for line in log]
+    file = day + '.log'
+    timings = []
+    for i in range(repeats):
+        started = perf_counter()
+        for line in lines:
+            module.format_line(line, WINDOW, file)
+        timings.append(perf_counter() - started)
+    return len(lines) / percentile(timings, 0.5)
+
+# Run every benchmark and return its results by name as {'value', 'unit', 'better'}
+def run(logs, days, day_size, size, iterations, repeats, seed):
+    directory = os.path.join(logs, 'users', USER, 'moddata', 'log', NETWORK, WINDOW)
+    if os.path.isdir(directory):
+        dates = chathistory.list_log_files(directory + '/')[0]
+    else:
+        dates = generate_logs(directory, days, day_size, seed)
+    directory += '/'
+
+    module = load_module(logs, size)
+    try:
+        results = {}
+        for name, day in (('scan today', dates[-1]), ('scan past day', dates[0])):
+            megabytes, lines = bench_scan(module, directory, day, repeats)
+            results[name] = {'value': megabytes, 'unit': 'MB/s', 'better': 'higher'}
+            results[name + ' lines'] = {'value': lines, 'unit': 'lines/s', 'better': 'higher'}
+        results['format_line'] = {'value': bench_format(module, directory, dates[0], repeats), 'unit': 'lines/s', 'better': 'higher'}
+        for name, (latencies, sent) in bench_requests(module, dates, size, iterations, repeats, seed).items():
+            results[name + ' p50'] = {'value': percentile(latencies, 0.5) * 1000, 'unit': 'ms', 'better': 'lower'}
+            results[name + ' p99'] = {'value': percentile(latencies, 0.99) * 1000, 'unit': 'ms', 'better': 'lower'}
+            results[name + ' lines'] = {'value': sent / iterations, 'unit': 'lines', 'better': None}
+    finally:
+        module.OnShutdown()
+    return results
+
+# Return the report lines comparing the results with the baseline, and the names of the results that regressed
+def compare(results, baseline, threshold):
+    report = ['{:<24} {:>12} {:>12} {:>8}  {}'.format('benchmark', 'result', 'baseline', 'change', 'unit')]
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base['value'] or not result['value']:
+            report.append('{:<24} {:>12.2f} {:>12} {:>8}  {}'.format(name, result['value'], '-', '', result['unit']))
+            continue
+        change = result['value'] / base['value'] - 1
+        # How much slower the result is, whichever way is better
+        slowdown = {'higher': base['value'] / result['value'] - 1, 'lower': change}.get(result['better'], 0)
+        flag = 'REGRESSION' if slowdown > threshold else ''
+        if flag:
+            regressions.append(name)
+        report.append('{:<24} {:>12.2f} {:>12.2f} {:>+7.0%}  {} {}'.format(name, result['value'], base['value'], change, result['unit'], flag))
+    return report, regressions
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark reading chathistory from the text logs.')
+    parser.add_argument('--logs', help='ZNC directory to write the synthetic logs to and reuse on later runs, a temporary one by default')
+    parser.add_argument('--days', type=int, default=3, help='Days of logs')
+    parser.add_argument('--day-size', type=float, default=4, help='Megabytes of each day')
+    parser.add_argument('--size', type=int, default=1000, help="The user's size setting, the limit of max-size requests")
+    parser.add_argument('--iterations', type=int, default=200, help='Requests of each kind')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs of the throughput benchmarks and of each request')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='Slowdown reported as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+    arguments = parser.parse_args()
+
+    settings = {'days': arguments.days, 'day_size': arguments.day_size, 'size': arguments.size,
+                'iterations': arguments.iterations, 'seed': arguments.seed}
+    with tempfile.TemporaryDirectory() as temporary:
+        results = run(arguments.logs or temporary, arguments.days, int(arguments.day_size * 1024 * 1024), arguments.size,
+                      arguments.iterations, arguments.repeats, arguments.seed)
+
+    baseline = {'settings': settings, 'results': {}}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as data_file:
+            baseline = json.load(data_file)
+    report, regressions = compare(results, baseline['results'], arguments.threshold)
+    if baseline['settings'] != settings:
+        report.append('The baseline was stored with other settings: {}'.format(baseline['settings']))
+    if arguments.save_baseline:
+        with open(BASELINE_FILE, 'w') as data_file:
+            results = {name: dict(result, value=round(result['value'], 3)) for name, result in results.items()}
+            json.dump({'settings': settings, 'results': results}, data_file, indent=4, sort_keys=True)
+        report.append('Stored the results as the baseline.')
+    elif regressions:
+        report.append('{} regression(s) over {:.0%}: {}'.format(len(regressions), arguments.threshold, ', '.join(regressions)))
+
+    with open(OUTPUT_FILE, 'w') as output:
+        output.write('\n'.join(report) + '\n')
+    print('\n'.join(report))
+    sys.exit(1 if regressions and not arguments.save_baseline else 0)
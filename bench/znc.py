@@ -0,0 +1,173 @@
+#  Stand-in for the znc module modpython provides, with just enough of the ZNC API for chathistory to be loaded and
+#  its requests to be read outside of ZNC. Benchmarks put this directory first on sys.path so 'import znc' finds it.
+
+import os.path
+
+CONTINUE, HALT, HALTMODS, HALTCORE = 1, 2, 3, 4
+
+class CModInfo:
+    GlobalModule = 1
+
+class CTable:
+    """Table sent with PutModule, keeping its rows as dicts."""
+
+    def __init__(self, max_width=0):
+        self.columns = []
+        self.rows = []
+
+    def AddColumn(self, name):
+        self.columns.append(name)
+
+    def AddRow(self):
+        self.rows.append({})
+
+    def SetCell(self, column, value):
+        self.rows[-1][column] = value
+
+class Client:
+    """A connected client, keeping the lines sent to it."""
+
+    def __init__(self, nick='bench'):
+        self.this = id(self)
+        self.nick = nick
+        self.lines = []
+
+    def GetNick(self):
+        return self.nick
+
+    def GetNickMask(self):
+        return '{}!bench@znc.in'.format(self.nick)
+
+    def PutClient(self, line):
+        self.lines.append(line)
+
+    def PutModule(self, module, line):
+        self.lines.append(line)
+
+class Network:
+    def __init__(self, name):
+        self.name = name
+        self.clients = []
+
+    def GetName(self):
+        return self.name
+
+    def GetClients(self):
+        return self.clients
+
+class User:
+    def __init__(self, name, admin=True):
+        self.name = name
+        self.admin = admin
+        self.networks = []
+        # Timezone name set in ZNC, empty for the local time
+        self.timezone = ''
+
+    def GetUserName(self):
+        return self.name
+
+    def IsAdmin(self):
+        return self.admin
+
+    def GetTimezone(self):
+        return self.timezone
+
+    def GetNetworks(self):
+        return self.networks
+
+    def GetBufferCount(self):
+        return 50
+
+    def GetAllClients(self):
+        return [client for network in self.networks for client in network.clients]
+
+    def PutModule(self, module, line):
+        for client in self.GetAllClients():
+            client.PutModule(module, line)
+
+class ZNC:
+    def __init__(self):
+        self.path = os.path.expanduser('~/.znc')
+        self.users = {}
+
+    def GetZNCPath(self):
+        return self.path
+
+    def GetMaxBufferSize(self):
+        return 500
+
+    def GetUserMap(self):
+        return self.users
+
+    def FindUser(self, name):
+        return self.users.get(name)
+
+class CZNC:
+    instance = ZNC()
+
+    @staticmethod
+    def Get():
+        return CZNC.instance
+
+class Timer:
+    """Timers don't run on their own, the caller runs RunJob of those in the module's timers."""
+
+    def GetModule(self):
+        return self.module
+
+    def Stop(self):
+        if self in self.module.timers:
+            self.module.timers.remove(self)
+
+class Module:
+    """A global module with one user, connected to one network from one client."""
+
+    def __init__(self, user='bench', network='net', save_path=None):
+        self.user = CZNC.Get().users[user] = User(user)
+        self.network = Network(network)
+        self.user.networks.append(self.network)
+        self.client = Client()
+        self.network.clients.append(self.client)
+        self.save_path = save_path
+        self.nv = {}
+        self.timers = []
+
+    def GetUser(self):
+        return self.user
+
+    def GetNetwork(self):
+        return self.network
+
+    def GetClient(self):
+        return self.client
+
+    def GetModName(self):
+        return 'chathistory'
+
+    def GetSavePath(self):
+        return self.save_path
+
+    def PutModule(self, line):
+        self.client.PutModule(self.GetModName(), line)
+
+    def GetNV(self, key):
+        return self.nv.get(key, '')
+
+    def SetNV(self, key, value):
+        self.nv[key] = value
+        return True
+
+    def DelNV(self, key):
+        return self.nv.pop(key, None) is not None
+
+    # ZNC refuses a timer labelled like another of the module's, ignoring case, and modpython labels them all 'pytimer'
+    # by default. ZNC drops the refused timer, the stand-in raises instead.
+    def CreateTimer(self, timer_class, interval=10, cycles=1, label='pytimer', description='Some python timer'):
+        if any(timer.label.lower() == label.lower() for timer in self.timers):
+            raise Exception('A timer labelled {} is already running'.format(label))
+        timer = timer_class()
+        timer.module = self
+        timer.interval = interval
+        timer.label = label
+        self.timers.append(timer)
+        return timer
@@ -0,0 +1,74 @@
+#  The tests load the module outside of ZNC with the znc stand-in of the benchmarks: python3 -m pytest tests
+
+import os.path
+import sys
+import time
+import types
+from collections import defaultdict
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+sys.path[0:0] = [os.path.join(ROOT_DIR, 'bench'), ROOT_DIR]
+
+import znc
+import chathistory
+
+USER = 'alice'
+NETWORK = 'net'
+
+# Return a function loading the module as ZNC would with a user whose settings and logs are under a temporary ZNC
+# directory, given the module arguments and the user's settings. The modules are unloaded after the test.
+@pytest.fixture
+def load_module(tmp_path):
+    modules = []
+
+    def load(args='', **settings):
+        znc.CZNC.Get().path = str(tmp_path)
+        module = chathistory.chathistory(USER, NETWORK, str(tmp_path / 'moddata' / 'chathistory'))
+        os.makedirs(module.GetSavePath(), exist_ok=True)
+        settings.setdefault('pace', 0)
+        settings.setdefault('path', str(tmp_path) + '/users/$USER/moddata/log/$NETWORK/$WINDOW/')
+        module.config = defaultdict(dict, {USER: settings})
+        message = types.SimpleNamespace(s='')
+        assert module.OnLoad(args, message), message.s
+        modules.append(module)
+        return module
+
+    yield load
+    for module in modules:
+        module.OnShutdown()
+
+# Directory of the logs of a window of the test user
+def log_directory(znc_path, window):
+    return os.path.join(str(znc_path), 'users', USER, 'moddata', 'log', NETWORK, window)
+
+# Append lines to the log file of a day in a window directory
+def write_log(directory, day, lines):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, day + '.log'), 'a') as log:
+        log.write(''.join(line + '\n' for line in lines))
+
+# Append lines to the log of a window as ZNC's log module does for the live events the module captures with them
+def log_live(module, znc_path, window, day, lines):
+    write_log(log_directory(znc_path, window), day, lines)
+    for line in lines:
+        module.capture(window, 'PRIVMSG', 'bob', 'bob', 'host', message=line)
+
+# Send a line from the test user's client and run the delivery timer until it was answered, returning the lines the
+# client got since the last call
+def send(module, line):
+    client = module.GetClient()
+    client.lines.clear()
+    module.OnUserRaw(line)
+    while module.delivery_timer is not None:
+        time.sleep(0.01)
+        module.delivery_timer.RunJob()
+    lines = list(client.lines)
+    client.lines.clear()
+    return lines
+
+# Messages of the replayed lines, in the order they were sent
+def messages(lines):
+    return [line.rsplit(' :', 1)[1] for line in lines if ' PRIVMSG ' in line]
@@ -0,0 +1,106 @@
+#  Stand-in for PyMySQL backed by an SQLite file in WAL mode, the database name being its path. Like PyMySQL without
+#  autocommit, the first statement after a commit or a rollback starts a transaction, and reads see the snapshot taken
+#  by the first one until the transaction ends. Tests put it in sys.modules as 'pymysql'.
+
+import re
+import sqlite3
+from datetime import datetime
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS logs (
+        id INTEGER PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        user TEXT NOT NULL,
+        network TEXT,
+        `window` TEXT NOT NULL,
+        type TEXT NOT NULL,
+        nick TEXT,
+        ident TEXT,
+        host TEXT,
+        param TEXT,
+        message TEXT
+    );
+    CREATE TABLE IF NOT EXISTS imported_files (
+        path TEXT NOT NULL PRIMARY KEY,
+        size INTEGER NOT NULL
+    );
+"""
+
+# Statements of the MySQL schema, answered without running them
+schema_statement_regex = re.compile(r'^\s*(CREATE|ALTER)\b|information_schema')
+timestamp_regex = re.compile(r'^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d+$')
+
+# Connections opened, for the tests to count
+connections = []
+# Names of the indexes added with ALTER TABLE
+indexes = set()
+
+class MySQLError(Exception):
+    pass
+
+class Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, sql, args=()):
+        if schema_statement_regex.search(sql):
+            self.rows = [(len(indexes),)] if 'information_schema' in sql else []
+            if sql.startswith('ALTER'):
+                if indexes:
+                    raise MySQLError(1061, "Duplicate key name 'logs_message'")
+                indexes.add('logs_message')
+            return
+        self.conn.begin()
+        sql = sql.replace('%s', '?').replace('ON DUPLICATE KEY UPDATE size = VALUES(size)', 'ON CONFLICT (path) DO UPDATE SET size = excluded.size')
+        self.rows = self.conn.db.execute(sql, args).fetchall()
+
+    def executemany(self, sql, rows):
+        self.conn.begin()
+        self.conn.db.executemany(sql.replace('%s', '?'), rows)
+
+    # DATETIME columns come back as datetime objects
+    def fetchall(self):
+        return tuple(tuple(datetime.strptime(value, '%Y-%m-%d %H:%M:%S.%f') if isinstance(value, str) and timestamp_regex.match(value) else value
+                           for value in row) for row in self.rows)
+
+    def fetchone(self):
+        rows = self.fetchall()
+        return rows[0] if rows else None
+
+class Connection:
+    def __init__(self, database):
+        self.db = sqlite3.connect(database, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        self.in_transaction = False
+        self.open = True
+        connections.append(self)
+
+    def begin(self):
+        if not self.in_transaction:
+            self.db.execute('BEGIN')
+            self.in_transaction = True
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        if self.in_transaction:
+            self.db.execute('COMMIT')
+            self.in_transaction = False
+
+    def rollback(self):
+        if self.in_transaction:
+            self.db.execute('ROLLBACK')
+            self.in_transaction = False
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.db.close()
+        self.open = False
+
+def connect(host=None, user=None, password=None, database=None, **options):
+    return Connection(database)
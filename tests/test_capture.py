@@ -0,0 +1,51 @@
+#  Live capture: the journal rows spill to when the database writer falls behind, unloading the module, and the labels
+#  of the timers running next to the capture timer
+
+import time
+import types
+
+import chathistory
+from conftest import NETWORK, USER
+
+def rows(count, start=0):
+    return [('2020-01-01 00:00:{:02d}.000'.format(i), USER, NETWORK, '#chan', 'PRIVMSG', 'bob', None, None, None, str(i))
+            for i in range(start, start + count)]
+
+def test_journal_keeps_unread_rows_across_reloads(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = chathistory.CaptureJournal(path)
+    journal.write(rows(5))
+    assert journal.read(2) == rows(2)
+    # Unloading writes the rows the writer hasn't received, the next load reads the journal from the start
+    journal.write(rows(2, 5))
+    journal = chathistory.CaptureJournal(path)
+    assert journal.read(10) == rows(5, 2)
+    assert journal.read(10) == []
+
+def test_journal_drops_read_rows_when_unloaded_without_new_rows(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = chathistory.CaptureJournal(path)
+    journal.write(rows(5))
+    assert journal.read(5) == rows(5)
+    journal.write([])
+    assert chathistory.CaptureJournal(path).read(10) == []
+
+def test_unload_after_invalid_connection_string(tmp_path):
+    module = chathistory.chathistory(USER, NETWORK, str(tmp_path))
+    message = types.SimpleNamespace(s='')
+    assert not module.OnLoad('postgres://nope', message)
+    assert 'Unrecognized connection string' in message.s
+    module.OnShutdown()
+
+def test_timers_have_labels_of_their_own(load_module, tmp_path):
+    module = load_module('sqlite://' + str(tmp_path / 'logs.sqlite'))
+    module.OnModCommand('set strip true')
+    module.start_delivery()
+    labels = [timer.label for timer in module.timers]
+    assert len(labels) == 3 and len(set(labels)) == 3
+    # The delivery timer stops itself when there is nothing to deliver, the next one gets another label
+    delivered = module.delivery_timer.label
+    module.delivery_timer.RunJob()
+    assert module.delivery_timer is None
+    module.start_delivery()
+    assert module.delivery_timer.label != delivered
@@ -0,0 +1,80 @@
+#  Identical requests of a user's clients read once and answered to each client, and the token bucket limiting how many
+#  requests a user sends
+
+import time
+
+import pytest
+
+import chathistory
+import znc
+from conftest import USER, log_directory, messages, send, write_log
+
+@pytest.fixture
+def module(load_module, tmp_path):
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', ['[00:00:0{0}] <bob> m{0}'.format(i) for i in range(5)])
+    module = load_module()
+    module.GetClient().lines.clear()
+    return module
+
+# Add another client of the test user and return it
+def connect(module):
+    client = znc.Client('other')
+    module.GetNetwork().clients.append(client)
+    return client
+
+# Send lines from clients while the results of the workers are left unread, so they all arrive while the first is read,
+# then deliver them
+def send_together(module, monkeypatch, requests):
+    main = module.client
+    with monkeypatch.context() as patch:
+        patch.setattr(module.history_workers, 'poll', lambda timeout=0: [])
+        for client, line in requests:
+            module.client = client
+            module.OnUserRaw(line)
+    module.client = main
+    while module.delivery_timer is not None:
+        time.sleep(0.01)
+        module.delivery_timer.RunJob()
+
+def batch_ids(lines):
+    return [line.split()[2][1:] for line in lines if ' BATCH +' in line]
+
+def test_identical_requests_are_read_once_and_each_client_gets_a_batch(module, monkeypatch):
+    main, other = module.GetClient(), connect(module)
+    main.lines.clear()
+    send_together(module, monkeypatch, [(main, 'CHATHISTORY LATEST #chan * 3'), (other, 'CHATHISTORY LATEST #chan * 3'),
+                                        (other, 'CHATHISTORY LATEST #chan * 2')])
+    assert messages(main.lines) == ['m2', 'm3', 'm4']
+    assert messages(other.lines) == ['m2', 'm3', 'm4', 'm3', 'm4']
+    assert len(set(batch_ids(main.lines) + batch_ids(other.lines))) == 3
+    stats = module.request_stats[USER]
+    assert (stats.requests, stats.coalesced) == (3, 1)
+
+def test_requests_are_not_joined_once_answered(module):
+    assert messages(send(module, 'CHATHISTORY LATEST #chan * 3')) == ['m2', 'm3', 'm4']
+    assert messages(send(module, 'CHATHISTORY LATEST #chan * 3')) == ['m2', 'm3', 'm4']
+    assert module.request_stats[USER].coalesced == 0
+
+def test_token_bucket_allows_bursts_then_refills_at_the_rate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(chathistory, 'time', lambda: now[0])
+    bucket = chathistory.TokenBucket()
+    assert all(bucket.take() for i in range(chathistory.REQUEST_BURST))
+    assert not bucket.take()
+    now[0] += 1 / chathistory.REQUEST_RATE
+    assert bucket.take()
+    assert not bucket.take()
+    # Never holds more than a burst
+    now[0] += 3600
+    assert sum(bucket.take() for i in range(chathistory.REQUEST_BURST * 2)) == chathistory.REQUEST_BURST
+
+def test_requests_over_the_rate_limit_are_rejected(module, monkeypatch):
+    monkeypatch.setattr(chathistory, 'REQUEST_BURST', 2)
+    monkeypatch.setattr(chathistory, 'REQUEST_RATE', 0.001)
+    main = module.GetClient()
+    # Joining a request in flight takes no token
+    send_together(module, monkeypatch, [(main, 'CHATHISTORY LATEST #chan * 3'), (main, 'CHATHISTORY LATEST #chan * 3')])
+    assert messages(send(module, 'CHATHISTORY LATEST #chan * 2')) == ['m3', 'm4']
+    assert send(module, 'CHATHISTORY LATEST #chan * 1') == ['bench!bench@znc.in CHATHISTORY ERR :TOO_MANY_REQUESTS']
+    stats = module.request_stats[USER]
+    assert (stats.coalesced, stats.limited) == (1, 1)
@@ -0,0 +1,79 @@
+#  Compressed log files: reading them from any offset, forwards and backwards, and requests reading them like the
+#  plain files they were compressed from
+
+import importlib.util
+import io
+import os.path
+import random
+from collections import OrderedDict
+
+import pytest
+
+import chathistory
+from conftest import NETWORK, USER, log_directory, write_log
+
+KINDS = ['gzip', pytest.param('zstd', marks=pytest.mark.skipif(not importlib.util.find_spec('zstandard'), reason='needs zstandard'))]
+
+@pytest.fixture(autouse=True)
+def small_seek_intervals(monkeypatch):
+    monkeypatch.setattr(chathistory, 'ARCHIVE_SEEK_INTERVAL', 4096)
+    monkeypatch.setattr(chathistory, 'ARCHIVE_READ_SIZE', 512)
+
+def write_lines(path, count):
+    write_log(os.path.dirname(path), os.path.basename(path)[:-4],
+              ['[{:02d}:{:02d}:{:02d}] <bob> line {}'.format(i // 3600 % 24, i // 60 % 60, i % 60, i) for i in range(count)])
+    with open(path, 'rb') as log:
+        return log.read()
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_reads_from_any_offset_forwards_and_backwards(tmp_path, kind):
+    path = str(tmp_path / '2020-01-01.log')
+    contents = write_lines(path, 2000)
+    assert chathistory.compress_log(path, kind)[0] == len(contents)
+    assert not os.path.exists(path)
+    path += '.gz' if kind == 'gzip' else '.zst'
+    seek_indexes = OrderedDict()
+    with chathistory.open_log(path, seek_indexes) as log:
+        assert log.seek(0, io.SEEK_END) == len(contents)
+        index = seek_indexes[path]
+        assert len(index.offsets) >= len(contents) // (2 * 4096)
+        # Backwards in blocks, like reverse reads
+        for end in range(len(contents), 0, -1000):
+            log.seek(max(end - 1000, 0))
+            assert log.read(end - max(end - 1000, 0)) == contents[max(end - 1000, 0):end]
+        # Forwards and anywhere
+        offsets = [random.randrange(len(contents)) for i in range(50)]
+        for offset in sorted(offsets) + offsets:
+            log.seek(offset)
+            assert log.read(300) == contents[offset:offset + 300]
+        log.seek(len(contents) - 10)
+        assert log.read() == contents[-10:]
+        assert log.read(10) == b''
+    # Seek points found by one reader are used by the next, until the file changes
+    with chathistory.open_log(path, seek_indexes) as log:
+        assert seek_indexes[path] is index
+        middle = len(contents) // 2
+        log.seek(middle)
+        assert log.readline() == contents[middle:contents.index(b'\n', middle) + 1]
+    os.utime(path, ns=(0, 0))
+    with chathistory.open_log(path, seek_indexes) as log:
+        assert seek_indexes[path] is not index
+        assert log.read() == contents
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_requests_read_compressed_days_like_plain_ones(load_module, tmp_path, kind):
+    directory = log_directory(tmp_path, '#chan')
+    for day in ('2020-01-01', '2020-01-02', '2020-01-03'):
+        write_lines(os.path.join(directory, day + '.log'), 600)
+    requests = [('BEFORE', ['2020-01-03 00:00:10.000'], 500), ('AFTER', ['2020-01-01 00:05:00.000'], 500),
+                ('AROUND', ['2020-01-02 00:04:00.000'], 100), ('LATEST', [], 700),
+                ('BETWEEN', ['2020-01-02 00:09:00.000', '2020-01-01 00:01:00.000'], 1000)]
+    module = load_module()
+    user_config = module.get_user_config(USER, NETWORK)
+    plain = [module.read_history(user_config, USER, NETWORK, '#chan', *request) for request in requests]
+    for day in ('2020-01-01', '2020-01-02'):
+        chathistory.compress_log(os.path.join(directory, day + '.log'), kind)
+    assert [module.read_history(user_config, USER, NETWORK, '#chan', *request) for request in requests] == plain
+    # Msgids of lines in compressed files still find them
+    anchor = chathistory.parse_msgid(plain[1][0].split(';', 1)[0])
+    assert module.read_history(user_config, USER, NETWORK, '#chan', 'AFTER', [anchor], 2) == plain[1][1:3]
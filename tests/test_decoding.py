@@ -0,0 +1,33 @@
+#  Log lines that aren't valid UTF-8, as ZNC logs the bytes networks without an encoding set send, decoded with the
+#  user's fallback encoding wherever lines are read
+
+import os.path
+
+import pytest
+
+from conftest import NETWORK, USER, log_directory, messages
+
+LINES = ['caf\xe9 in latin-1'.encode('latin-1'), 'caf\xe9 in UTF-8'.encode('utf-8'), 'ж in cp1251'.encode('cp1251')]
+
+@pytest.fixture
+def directory(tmp_path):
+    directory = log_directory(tmp_path, '#chan')
+    os.makedirs(directory)
+    # A past day, parsed and kept, and the newest day, read for each request
+    for day in ('2020-01-01', '2020-01-02'):
+        with open(os.path.join(directory, day + '.log'), 'wb') as log:
+            log.write(b''.join(b'[00:00:0%d] <bob> ' % i + line + b'\n' for i, line in enumerate(LINES)))
+    return directory
+
+@pytest.mark.parametrize('encoding, expected', [
+    (None, ['caf\xe9 in latin-1', 'caf\xe9 in UTF-8', '\xe6 in cp1251']),
+    ('cp1251', ['cafй in latin-1', 'caf\xe9 in UTF-8', 'ж in cp1251']),
+])
+def test_lines_that_are_not_utf8_use_the_fallback_encoding(load_module, directory, encoding, expected):
+    module = load_module(**({'encoding': encoding} if encoding else {}))
+    user_config = module.get_user_config(USER, NETWORK)
+    for anchors in (['2020-01-01 00:00:03.000'], ['2020-01-02 00:00:03.000']):
+        assert messages(module.read_history(user_config, USER, NETWORK, '#chan', 'BEFORE', anchors, 3)) == expected
+    # And from the hot tail
+    assert messages(module.read_history(user_config, USER, NETWORK, '#chan', 'LATEST', [], 3, 0)) == expected
+    assert module.read_metrics['hot_tail_hits'] == 1
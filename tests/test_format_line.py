@@ -0,0 +1,27 @@
+#  format_line against the output of the regex cascade it replaced, recorded with extras off and on for the lines of
+#  golden/2020-01-01.log: a busy channel's messages and events, hand-written edge cases and malformed lines
+
+import json
+import os.path
+
+import pytest
+
+from conftest import TESTS_DIR
+
+GOLDEN_LOG = os.path.join(TESTS_DIR, 'golden', '2020-01-01.log')
+GOLDEN_OUTPUT = os.path.join(TESTS_DIR, 'golden', '2020-01-01.expected.json')
+
+def read_corpus():
+    with open(GOLDEN_LOG, 'rb') as log:
+        lines = [line.decode('utf-8') for line in log]
+    with open(GOLDEN_OUTPUT, encoding='utf-8') as data_file:
+        expected = json.load(data_file)
+    assert len(lines) == len(expected)
+    return lines, expected
+
+@pytest.mark.parametrize('extras', [False, True])
+def test_format_line_matches_golden_output(load_module, extras):
+    module = load_module(extras=extras)
+    lines, expected = read_corpus()
+    for line, outputs in zip(lines, expected):
+        assert module.format_line(line, '#chan', '2020-01-01.log') == outputs[extras], line
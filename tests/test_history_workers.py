@@ -0,0 +1,29 @@
+#  Chathistory requests read by the worker processes: results collected as they arrive, and a user's requests over the
+#  limit of those being read waiting for their turn
+
+import time
+
+from conftest import log_directory, write_log
+
+WINDOWS = ['#chan{}'.format(i) for i in range(10)]
+
+def batches(lines):
+    return [line.split()[-1] for line in lines if ' BATCH +' in line]
+
+def test_requests_are_answered_without_waiting_for_the_timer(load_module, tmp_path):
+    for window in WINDOWS:
+        write_log(log_directory(tmp_path, window), '2020-01-01', ['[00:00:01] <bob> hello ' + window])
+    module = load_module()
+    client = module.GetClient()
+    client.lines.clear()
+    started = time.time()
+    # The per-window requests clients send when they reconnect, more than a user may have read at once
+    for window in WINDOWS:
+        module.OnUserRaw('CHATHISTORY LATEST {} * 50'.format(window))
+    while module.delivery_timer is not None:
+        time.sleep(0.01)
+        module.delivery_timer.RunJob()
+    assert time.time() - started < 1
+    assert not [line for line in client.lines if 'TOO_MANY_REQUESTS' in line]
+    assert sorted(batches(client.lines)) == sorted(WINDOWS)
+    assert not module.history_workers.busy()
@@ -0,0 +1,68 @@
+#  The hot tail answering requests for recent lines from memory, which must give what reading the logs gives as lines
+#  are appended and a new day starts
+
+import pytest
+
+from conftest import NETWORK, USER, log_directory, log_live, write_log
+
+REQUESTS = [
+    ('LATEST', [], 10),
+    ('LATEST', [], 50),
+    ('LATEST', ['2020-01-01 00:00:40.000'], 50),
+    ('BEFORE', ['2020-01-01 00:00:45.000'], 5),
+    ('BEFORE', ['2020-01-02 00:00:01.000'], 5),
+    ('AFTER', ['2020-01-01 00:00:40.000'], 5),
+    ('AROUND', ['2020-01-01 00:00:45.000'], 6),
+    ('BETWEEN', ['2020-01-01 00:00:30.000', '2020-01-02 00:00:02.000'], 50),
+]
+
+def lines(start, count, day='2020-01-01'):
+    # Two lines a second, so some requests start or end between lines with the same time
+    return ['[00:00:{:02d}] <bob> {} {}'.format(i // 2, day, i) for i in range(start, start + count)]
+
+# Assert that each request gives the same lines from the hot tail as from the log files, returning how many the hot tail
+# answered
+def assert_hot_tail_matches_logs(module):
+    user_config = module.get_user_config(USER, NETWORK)
+    hits = module.read_metrics['hot_tail_hits']
+    for subcommand, anchors, limit in REQUESTS:
+        live_events = module.live_events[(USER, NETWORK, '#chan')]
+        hot = module.read_history(user_config, USER, NETWORK, '#chan', subcommand, anchors, limit, live_events)
+        logs = module.read_history(user_config, USER, NETWORK, '#chan', subcommand, anchors, limit)
+        assert hot == logs, (subcommand, anchors, limit)
+    return module.read_metrics['hot_tail_hits'] - hits
+
+@pytest.fixture
+def module(load_module, tmp_path):
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', lines(0, 80))
+    return load_module()
+
+def test_hot_tail_matches_logs_as_lines_are_appended(module, tmp_path):
+    assert assert_hot_tail_matches_logs(module) > 0
+    log_live(module, tmp_path, '#chan', '2020-01-01', lines(80, 10))
+    assert assert_hot_tail_matches_logs(module) > 0
+    # A line ZNC is still writing is left out until it ends
+    directory = log_directory(tmp_path, '#chan')
+    with open(directory + '/2020-01-01.log', 'a') as log:
+        log.write('[00:00:45] <bob> half')
+    module.capture('#chan', 'PRIVMSG', 'bob', 'bob', 'host', message='half')
+    assert assert_hot_tail_matches_logs(module) > 0
+    log_live(module, tmp_path, '#chan', '2020-01-01', [' a line'])
+    assert assert_hot_tail_matches_logs(module) > 0
+
+def test_hot_tail_matches_logs_when_a_new_day_starts(module, tmp_path):
+    assert_hot_tail_matches_logs(module)
+    log_live(module, tmp_path, '#chan', '2020-01-02', lines(0, 6, '2020-01-02'))
+    assert assert_hot_tail_matches_logs(module) > 0
+    log_live(module, tmp_path, '#chan', '2020-01-02', lines(6, 6, '2020-01-02'))
+    log_live(module, tmp_path, '#chan', '2020-01-03', lines(0, 2, '2020-01-03'))
+    assert assert_hot_tail_matches_logs(module) > 0
+
+def test_hot_tail_only_catches_up_after_live_events(module, tmp_path):
+    user_config = module.get_user_config(USER, NETWORK)
+    latest = module.read_history(user_config, USER, NETWORK, '#chan', 'LATEST', [], 1, 0)
+    # Lines that reach the logs without the module seeing them, like while it was unloaded, are read once it sees one
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', lines(80, 1))
+    assert module.read_history(user_config, USER, NETWORK, '#chan', 'LATEST', [], 1, 0) == latest
+    module.capture('#chan', 'PRIVMSG', 'bob', 'bob', 'host', message='')
+    assert module.read_history(user_config, USER, NETWORK, '#chan', 'LATEST', [], 1, 1)[0].endswith('2020-01-01 80')
@@ -0,0 +1,70 @@
+#  The import command, importing the text logs into the database from a background job
+
+import os.path
+import sys
+import time
+
+import chathistory
+
+from conftest import NETWORK, USER, log_directory, write_log
+
+LOW = ('0000-01-01 00:00:00.000', -1)
+HIGH = ('9999-12-31 23:59:59.999', sys.maxsize)
+
+# Run the job's timer until the job is done, returning the module messages it sent
+def run_job(module):
+    deadline = time.time() + 30
+    while module.job_timer in module.timers:
+        assert time.time() < deadline
+        time.sleep(0.01)
+        module.job_timer.RunJob()
+    return module.GetClient().lines
+
+def test_import_command(load_module, tmp_path):
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', ['[00:00:01] <bob> hello', '[00:00:02] * bob waves',
+                                                               '[00:00:03] *** Joins: carol (carol@host)'])
+    write_log(log_directory(tmp_path, 'bob'), '2020-01-02', ['[12:00:00] <bob> hi alice'])
+    module = load_module('sqlite://' + str(tmp_path / 'logs.sqlite'))
+    module.GetUser().timezone = 'UTC'
+    module.GetClient().lines.clear()
+    module.OnModCommand('import')
+    lines = run_job(module)
+    assert lines[0] == 'Import started.'
+    assert lines[-1].startswith('Import finished. 2 files, 4 rows')
+    assert module.job.exitcode == 0
+
+    rows = module.db.select(USER, NETWORK, '#chan', LOW, HIGH, 100, True)
+    assert [row[:3] + row[6:7] for row in rows] == [('2020-01-01 00:00:01.000', 'PRIVMSG', 'bob', 'hello'),
+                                                    ('2020-01-01 00:00:02.000', 'PRIVMSG', 'bob', '\x01ACTION waves\x01'),
+                                                    ('2020-01-01 00:00:03.000', 'JOIN', 'carol', None)]
+    assert [row[6] for row in module.db.select(USER, NETWORK, 'bob', LOW, HIGH, 100, True)] == ['hi alice']
+
+    # A second import only reads what was appended since
+    write_log(log_directory(tmp_path, 'bob'), '2020-01-02', ['[12:00:01] <alice> hi bob'])
+    module.GetClient().lines.clear()
+    module.OnModCommand('import')
+    assert run_job(module)[-1].startswith('Import finished. 2 files, 1 rows')
+    assert [row[6] for row in module.db.select(USER, NETWORK, 'bob', LOW, HIGH, 100, True)] == ['hi alice', 'hi bob']
+
+def test_import_stores_utc_and_leaves_out_captured_lines(load_module, tmp_path):
+    module = load_module('sqlite://' + str(tmp_path / 'logs.sqlite'))
+    module.GetUser().timezone = 'Europe/Berlin'
+    # Live events were captured from 2020-07-01 12:00 UTC on, 14:00 in Berlin
+    with open(os.path.join(module.GetSavePath(), chathistory.CAPTURE_START_FILE), 'w') as data_file:
+        data_file.write('2020-07-01 12:00:00.000\n')
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', ['[00:30:00] <bob> winter'])
+    write_log(log_directory(tmp_path, '#chan'), '2020-07-01', ['[13:59:59] <bob> summer', '[14:00:00] <bob> captured'])
+    module.OnModCommand('import')
+    assert run_job(module)[-1].startswith('Import finished. 2 files, 2 rows')
+    rows = module.db.select(USER, NETWORK, '#chan', LOW, HIGH, 100, True)
+    assert [(row[0], row[6]) for row in rows] == [('2019-12-31 23:30:00.000', 'winter'), ('2020-07-01 11:59:59.000', 'summer')]
+
+def test_import_reads_the_logs_where_the_user_set_them(load_module, tmp_path):
+    write_log(str(tmp_path / 'logs' / NETWORK / '#chan'), '2020-01-01', ['[00:00:01] <bob> elsewhere'])
+    # Not where the user's logs are
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', ['[00:00:02] <bob> default'])
+    module = load_module('sqlite://' + str(tmp_path / 'logs.sqlite'), path=str(tmp_path) + '/logs/$NETWORK/$WINDOW/')
+    module.GetUser().timezone = 'UTC'
+    module.OnModCommand('import')
+    assert run_job(module)[-1].startswith('Import finished. 1 files, 1 rows')
+    assert [row[6] for row in module.db.select(USER, NETWORK, '#chan', LOW, HIGH, 100, True)] == ['elsewhere']
@@ -0,0 +1,38 @@
+#  The time indexes narrowing down the parts of the newest log files that requests for history read
+
+import chathistory
+
+from conftest import NETWORK, USER, log_directory, messages, write_log
+
+def read(module, window, subcommand, anchors, limit=10):
+    user_config = module.get_user_config(USER, NETWORK)
+    return messages(module.read_history(user_config, USER, NETWORK, window, subcommand, anchors, limit))
+
+def test_times_going_backwards_read_the_whole_file(load_module, tmp_path):
+    # The clocks went back an hour at 02:00, the lines after it are logged with earlier times
+    write_log(log_directory(tmp_path, '#chan'), '2020-10-25', ['[01:30:00] <bob> one', '[01:45:00] <bob> two',
+                                                              '[01:59:00] <bob> three', '[01:05:00] <bob> four',
+                                                              '[01:20:00] <bob> five', '[02:10:00] <bob> six'])
+    module = load_module()
+    assert read(module, '#chan', 'BEFORE', ['2020-10-25 01:25:00.000']) == ['four', 'five']
+    assert read(module, '#chan', 'AFTER', ['2020-10-25 01:50:00.000']) == ['three', 'six']
+    assert not module.log_indexes[log_directory(tmp_path, '#chan') + '/2020-10-25.log'].ordered
+
+def test_times_in_order_read_only_part_of_the_file(load_module, tmp_path):
+    write_log(log_directory(tmp_path, '#chan'), '2020-10-25', ['[01:{:02d}:00] <bob> {}'.format(i, i) for i in range(60)])
+    module = load_module()
+    assert read(module, '#chan', 'BEFORE', ['2020-10-25 01:30:00.000'], 2) == ['28', '29']
+    index = module.log_indexes[log_directory(tmp_path, '#chan') + '/2020-10-25.log']
+    assert index.ordered
+    assert 0 < index.find('01:30:00') < index.find_end('01:30:00') < index.size
+
+def test_least_recently_used_indexes_are_dropped(load_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(chathistory, 'LOG_INDEXES', 2)
+    for window in ('#a', '#b', '#c'):
+        write_log(log_directory(tmp_path, window), '2020-10-25', ['[01:00:00] <bob> in ' + window])
+    module = load_module()
+    assert read(module, '#a', 'BEFORE', ['2020-10-25 02:00:00.000']) == ['in #a']
+    assert read(module, '#b', 'BEFORE', ['2020-10-25 02:00:00.000']) == ['in #b']
+    assert read(module, '#a', 'BEFORE', ['2020-10-25 02:00:00.000']) == ['in #a']
+    assert read(module, '#c', 'BEFORE', ['2020-10-25 02:00:00.000']) == ['in #c']
+    assert [path.split('/')[-2] for path in module.log_indexes] == ['#a', '#c']
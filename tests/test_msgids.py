@@ -0,0 +1,56 @@
+#  Msgids of replayed lines, derived from where they are in the logs, and requests anchored on them
+
+import pytest
+
+from conftest import log_directory, log_live, messages, send, write_log
+
+@pytest.fixture
+def module(load_module, tmp_path):
+    directory = log_directory(tmp_path, '#chan')
+    # Lines logged within the same second only msgids tell apart
+    write_log(directory, '2020-01-01', ['[00:00:00] <bob> m{}'.format(i) for i in range(4)])
+    write_log(directory, '2020-01-02', ['[00:00:00] <bob> n{}'.format(i) for i in range(2)])
+    write_log(log_directory(tmp_path, '#other'), '2020-01-01', ['[00:00:00] <bob> elsewhere'])
+    return load_module()
+
+# Return the msgids of a window's replayed lines keyed by their message
+def msgids(module, window='#chan'):
+    lines = [line for line in send(module, 'CHATHISTORY LATEST {} * 50'.format(window)) if ' PRIVMSG ' in line]
+    return {message: line.split('msgid=', 1)[1].split(';', 1)[0] for line, message in zip(lines, messages(lines))}
+
+def history(module, line, ids):
+    return messages(send(module, line.format(**ids)))
+
+def test_msgids_stay_the_same_as_lines_are_appended(module, tmp_path):
+    ids = msgids(module)
+    assert len(set(ids.values())) == 6
+    assert ids['m1'].split('-')[1] == '20200101' and ids['n1'].split('-')[1] == '20200102'
+    log_live(module, tmp_path, '#chan', '2020-01-02', ['[00:00:01] <bob> n2'])
+    appended = msgids(module)
+    assert appended.pop('n2') not in ids.values()
+    assert appended == ids
+
+@pytest.mark.parametrize('line, expected', [
+    ('CHATHISTORY BEFORE #chan msgid={m2} 10', ['m0', 'm1']),
+    ('CHATHISTORY AFTER #chan msgid={m2} 2', ['m3', 'n0']),
+    ('CHATHISTORY AFTER #chan draft/msgid={m2} 2', ['m3', 'n0']),
+    ('CHATHISTORY LATEST #chan msgid={n0} 10', ['n1']),
+    ('CHATHISTORY AROUND #chan msgid={m3} 3', ['m2', 'm3', 'n0']),
+    ('CHATHISTORY BETWEEN #chan msgid={m1} msgid={n1} 10', ['m2', 'm3', 'n0']),
+    ('CHATHISTORY BETWEEN #chan msgid={n1} msgid={m1} 1', ['n0']),
+    # Mixed with a timestamp
+    ('CHATHISTORY BETWEEN #chan msgid={m2} timestamp=2020-01-02T00:00:00.000Z 10', ['m3']),
+    ('CHATHISTORY #chan draft/msgid={m1} 2', ['m1', 'm2']),
+    ('CHATHISTORY #chan draft/msgid={m1} -2', ['m0']),
+])
+def test_requests_anchored_on_msgids(module, line, expected):
+    assert history(module, line, msgids(module)) == expected
+
+def test_msgids_of_other_windows_or_unknown_lines_find_nothing(module):
+    ids = msgids(module)
+    other = msgids(module, '#other')['elsewhere']
+    assert history(module, 'CHATHISTORY AFTER #chan msgid={other} 10', {'other': other}) == []
+    # An offset that isn't where a line starts
+    prefix, day, offset = ids['m1'].split('-')
+    missing = '{}-{}-{:x}'.format(prefix, day, int(offset, 16) + 1)
+    assert history(module, 'CHATHISTORY AFTER #chan msgid={missing} 10', {'missing': missing}) == []
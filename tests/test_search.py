@@ -0,0 +1,64 @@
+#  Searches of the text logs of the users who turned them on, which only read the index a background process keeps up
+#  to date
+
+import time
+
+from conftest import log_directory, write_log
+
+# Wait until the indexer went through the log paths after everything written so far: the pass in flight may have
+# started before, the one sent when it is done hasn't
+def catch_up(module):
+    for i in range(2):
+        assert module.search_index_pipe.poll(10)
+        module.update_search_index()
+
+def search(module, command):
+    module.OnModCommand(command)
+    while module.delivery_timer is not None:
+        time.sleep(0.01)
+        module.delivery_timer.RunJob()
+    lines = list(module.GetClient().lines)
+    module.GetClient().lines.clear()
+    return lines
+
+def test_search_reads_what_the_indexer_caught_up_with(load_module, tmp_path):
+    directory = log_directory(tmp_path, '#chan')
+    write_log(directory, '2020-01-01', ['[00:00:01] <bob> hello world', '[00:00:02] <carol> goodbye world'])
+    module = load_module(search=True)
+    module.GetClient().lines.clear()
+    catch_up(module)
+    assert search(module, 'search hello') == ['[2020-01-01 00:00:01] #chan <bob> hello world']
+
+    # Lines written since are found once the indexer caught up with them
+    write_log(directory, '2020-01-01', ['[00:00:03] <bob> hello again'])
+    assert search(module, 'search again') == ['No results.']
+    catch_up(module)
+    assert search(module, 'search again') == ['[2020-01-01 00:00:03] #chan <bob> hello again']
+
+def test_search_finds_new_days_and_reads_messages_from_the_logs(load_module, tmp_path):
+    module = load_module(search=True)
+    module.GetClient().lines.clear()
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-02', ['[10:00:00] -carol- notice me'])
+    catch_up(module)
+    assert search(module, 'search notice') == ['[2020-01-02 10:00:00] #chan -carol- notice me']
+    # Only where the messages are is indexed
+    columns = [row[1] for row in module.search_index.connection().execute('PRAGMA table_info(lines)')]
+    assert 'message' not in columns
+
+def test_search_is_off_unless_the_user_turns_it_on(load_module, tmp_path):
+    write_log(log_directory(tmp_path, '#chan'), '2020-01-01', ['[00:00:01] <bob> hello world'])
+    module = load_module()
+    module.GetClient().lines.clear()
+    assert module.search_indexer is None
+    assert search(module, 'search hello') == ['Searching the log files is off. Turn it on with \x02set search true\x02.']
+    module.OnModCommand('set search true')
+    module.GetClient().lines.clear()
+    catch_up(module)
+    assert search(module, 'search hello') == ['[2020-01-01 00:00:01] #chan <bob> hello world']
+
+def test_index_timer_has_a_label_of_its_own(load_module, tmp_path):
+    module = load_module()
+    module.start_delivery()
+    # Not modpython's default 'pytimer', which any other timer left unlabelled would clash with
+    assert module.search_index_timer.label.startswith('SearchIndex ')
+    assert module.search_index_timer.label != module.delivery_timer.label
@@ -0,0 +1,89 @@
+#  The CHATHISTORY subcommands and the older form of the command, read from the text logs across days
+
+import pytest
+
+import chathistory
+from conftest import log_directory, messages, send, write_log
+
+START = (chathistory.MIN_TIMESTAMP, -1)
+END = (chathistory.MAX_TIMESTAMP, -1)
+EARLY = ('2020-01-01 00:00:01.000', -1, None)
+LATE = ('2020-01-02 00:00:01.000', -1, None)
+
+@pytest.fixture
+def module(load_module, tmp_path):
+    directory = log_directory(tmp_path, '#chan')
+    write_log(directory, '2020-01-01', ['[00:00:0{0}] <bob> m{0}'.format(i) for i in range(5)])
+    write_log(directory, '2020-01-02', ['[00:00:0{0}] <bob> n{0}'.format(i) for i in range(3)])
+    write_log(log_directory(tmp_path, 'carol'), '2020-01-01', ['[12:00:00] <carol> hi'])
+    return load_module()
+
+def history(module, line):
+    return messages(send(module, line))
+
+@pytest.mark.parametrize('subcommand, anchors, limit, ranges', [
+    ('BEFORE', [EARLY], 5, [(START, EARLY[:2], 5, False)]),
+    ('AFTER', [EARLY], 5, [(('2020-01-01 00:00:01.001', -1), END, 5, True)]),
+    ('LATEST', [], 5, [(START, END, 5, False)]),
+    ('LATEST', [EARLY], 5, [(('2020-01-01 00:00:01.001', -1), END, 5, False)]),
+    ('AROUND', [EARLY], 5, [(START, EARLY[:2], 2, False), (EARLY[:2], END, 3, True)]),
+    ('AROUND', [EARLY], 1, [(EARLY[:2], END, 1, True)]),
+    ('BETWEEN', [EARLY, LATE], 5, [(('2020-01-01 00:00:01.001', -1), LATE[:2], 5, True)]),
+    ('BETWEEN', [LATE, EARLY], 5, [(('2020-01-01 00:00:01.001', -1), LATE[:2], 5, False)]),
+    # The older form of the command, forward from the anchor itself or backward with a negative limit
+    ('', [EARLY], 5, [(EARLY[:2], END, 5, True)]),
+    ('', [EARLY], -5, [(START, EARLY[:2], 5, False)]),
+])
+def test_history_ranges(subcommand, anchors, limit, ranges):
+    assert chathistory.history_ranges(subcommand, anchors, limit) == ranges
+
+def test_ranges_after_a_line_start_at_the_next_one():
+    # A msgid anchor resolves to the position of its line and of the one after it
+    anchor = ('2020-01-01 00:00:01.000', 14, 28)
+    assert chathistory.history_ranges('AFTER', [anchor], 5) == [(('2020-01-01 00:00:01.000', 28), END, 5, True)]
+    assert chathistory.history_ranges('BEFORE', [anchor], 5) == [(START, ('2020-01-01 00:00:01.000', 14), 5, False)]
+
+@pytest.mark.parametrize('line, expected', [
+    ('CHATHISTORY LATEST #chan * 3', ['n0', 'n1', 'n2']),
+    ('CHATHISTORY LATEST #chan timestamp=2020-01-02T00:00:00.000Z 10', ['n1', 'n2']),
+    ('CHATHISTORY BEFORE #chan timestamp=2020-01-02T00:00:01.000Z 2', ['m4', 'n0']),
+    ('CHATHISTORY AFTER #chan timestamp=2020-01-01T00:00:03.000Z 3', ['m4', 'n0', 'n1']),
+    ('CHATHISTORY AROUND #chan timestamp=2020-01-01T00:00:04.000Z 4', ['m2', 'm3', 'm4', 'n0']),
+    ('CHATHISTORY BETWEEN #chan timestamp=2020-01-01T00:00:01.000Z timestamp=2020-01-02T00:00:01.000Z 10',
+     ['m2', 'm3', 'm4', 'n0']),
+    # Limited from the first anchor's side
+    ('CHATHISTORY BETWEEN #chan timestamp=2020-01-01T00:00:01.000Z timestamp=2020-01-02T00:00:01.000Z 2', ['m2', 'm3']),
+    ('CHATHISTORY BETWEEN #chan timestamp=2020-01-02T00:00:01.000Z timestamp=2020-01-01T00:00:01.000Z 2', ['m4', 'n0']),
+    ('CHATHISTORY #chan timestamp=2020-01-01T00:00:03.000Z 2', ['m3', 'm4']),
+    ('CHATHISTORY #chan timestamp=2020-01-01T00:00:03.000Z -2', ['m1', 'm2']),
+    ('CHATHISTORY #chan timestamp=2020-01-01T00:00:03.000Z *', ['m3', 'm4', 'n0', 'n1', 'n2']),
+    ('CHATHISTORY LATEST #nowhere * 10', []),
+])
+def test_subcommands_read_across_days(module, line, expected):
+    assert history(module, line) == expected
+
+def test_replayed_lines_are_batched(module):
+    lines = send(module, 'CHATHISTORY LATEST #chan * 1')
+    assert len(lines) == 3
+    assert lines[0].split()[1:] == ['BATCH', '+' + lines[0].split()[2][1:], 'chathistory', '#chan']
+    assert lines[1].startswith('@batch={};msgid='.format(lines[0].split()[2][1:]))
+    assert ';time=2020-01-02T00:00:02.000Z :bob!' in lines[1]
+    assert lines[2].split()[1:] == ['BATCH', '-' + lines[0].split()[2][1:]]
+
+def test_targets_lists_windows_by_their_latest_message(module):
+    lines = send(module, 'CHATHISTORY TARGETS timestamp=2020-01-01T00:00:00.000Z timestamp=2020-01-03T00:00:00.000Z 5')
+    assert [line.split(' :', 1)[1] for line in lines[1:-1]] == ['irc.znc.in CHATHISTORY TARGETS carol 2020-01-01T12:00:00.000Z',
+                                                                 'irc.znc.in CHATHISTORY TARGETS #chan 2020-01-02T00:00:02.000Z']
+    lines = send(module, 'CHATHISTORY TARGETS timestamp=2020-01-01T00:00:00.000Z timestamp=2020-01-02T00:00:00.000Z 5')
+    assert [line.split()[-2] for line in lines[1:-1]] == ['carol']
+
+@pytest.mark.parametrize('line, error', [
+    ('CHATHISTORY LATEST #chan * 0', 'MSG_COUNT_INVALID'),
+    ('CHATHISTORY LATEST #chan * -5', 'MSG_COUNT_INVALID'),
+    ('CHATHISTORY LATEST #chan * 1e400', 'MSG_COUNT_INVALID'),
+    ('CHATHISTORY BEFORE #chan yesterday 5', 'CMD_INVALID'),
+    ('CHATHISTORY BETWEEN #chan timestamp=2020-01-01T00:00:01.000Z 5', 'CMD_INVALID'),
+    ('CHATHISTORY SOMETIME #chan * 5', 'CMD_INVALID'),
+])
+def test_invalid_requests(module, line, error):
+    assert send(module, line)[0].endswith('CHATHISTORY ERR :' + error)